@@ -10,9 +10,86 @@ ChatBook MVP - простой прототип для чтения текста
 4. Использует простой поиск по ключевым словам (без нейросетей)
 """
 
+import bisect
+import codecs
+import functools
+import json
 import os
+import re
+import stat
 import sys
-from typing import List, Tuple, Optional
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Optional
+
+
+# Ключевое слово: не меньше трёх букв подряд (короткие слова и цифры игнорируются)
+_WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+# Частые слова, которые встречаются почти в каждой части и не помогают найти ответ
+_STOPWORDS = frozenset({
+    # Русские
+    "что", "как", "это", "для", "или", "его", "она", "они", "оно", "так",
+    "все", "всё", "уже", "был", "была", "были", "было", "быть", "при", "про",
+    "под", "над", "без", "если", "чтобы", "когда", "где", "кто", "чем", "тоже",
+    "также", "только", "еще", "ещё", "даже", "там", "тут", "вот", "нет", "есть",
+    "мне", "меня", "тебя", "себя", "нас", "вас", "них", "ему", "ней", "этот",
+    "эта", "эти", "того", "тот", "том", "такой", "такая", "такие", "который",
+    "которая", "которые", "очень", "после", "перед", "через", "потом", "теперь",
+    # Английские
+    "the", "and", "are", "was", "were", "for", "with", "that", "this", "what",
+    "who", "when", "where", "why", "how", "from", "you", "his", "her", "she",
+    "they", "them", "have", "has", "had", "not", "but", "any", "can", "did",
+    "does", "into", "its", "our", "their", "there", "about", "which", "will",
+    "would",
+})
+
+# Команды выхода из программы
+_EXIT_CMDS = frozenset({'выход', 'exit', 'quit', 'q', ':q'})
+
+# Расширение файла, в котором рядом с текстом сохраняется готовый корпус
+INDEX_SUFFIX = ".idx"
+
+# Версия формата сохранённого корпуса; при изменении формата старые файлы игнорируются
+_INDEX_VERSION = 2
+
+# Типы массивов offsets, indptr и indices в сохранённом корпусе
+_INDEX_TYPECODES = ('q', 'i', 'i')
+
+# Граница предложения: пробелы после точки, восклицательного или вопросительного знака
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Размер начала файла, по которому проверяется кодировка (64 КБ)
+_SAMPLE_SIZE = 1 << 16
+
+# Кэш прочитанных файлов: (абсолютный путь, время изменения, размер) -> текст
+_FILE_CACHE: Dict[Tuple[str, int, int], str] = {}
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """
+    Определяет кодировку текста по началу файла.
+    
+    Сначала проверяет метку порядка байтов (BOM), затем пробует UTF-8;
+    если начало файла не в UTF-8, считает кодировку CP1251.
+    
+    Args:
+        sample: Первые байты файла
+        
+    Returns:
+        Название кодировки для bytes.decode
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    
+    try:
+        # Неполный символ в конце образца не считается ошибкой
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        # Пробуем другие кодировки, если UTF-8 не подходит
+        return 'cp1251'
+    return 'utf-8'
 
 
 def read_text_file(file_path: str) -> str:
@@ -28,31 +105,73 @@ def read_text_file(file_path: str) -> str:
     Raises:
         FileNotFoundError: Если файл не найден
         ValueError: Если файл пустой
+        UnicodeDecodeError: Если файл с BOM не декодируется указанной кодировкой
     """
-    # Проверяем существование файла
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Файл не найден: {file_path}")
+    # Проверяем существование файла (один системный вызов для всех проверок)
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Файл не найден: {file_path}") from None
     
     # Проверяем, что это файл, а не директория
-    if not os.path.isfile(file_path):
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"Указанный путь не является файлом: {file_path}")
     
+    # Файл нулевого размера пустой, открывать его не нужно
+    if st.st_size == 0:
+        raise ValueError(f"Файл пустой: {file_path}")
+    
+    # Если файл не менялся с прошлого чтения, возвращаем текст из кэша
+    cache_key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+    if cache_key in _FILE_CACHE:
+        return _FILE_CACHE[cache_key]
+    
+    # Читаем файл один раз в байтах, чтобы при смене кодировки не читать его повторно
+    with open(file_path, 'rb', buffering=1 << 20) as file:
+        data = file.read()
+    
     # Читаем файл с правильной кодировкой для русского текста
+    encoding = _detect_encoding(data[:_SAMPLE_SIZE])
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
+        text = data.decode(encoding)
     except UnicodeDecodeError:
-        # Пробуем другие кодировки, если UTF-8 не подходит
-        with open(file_path, 'r', encoding='cp1251') as file:
-            text = file.read()
+        # Файл с BOM повреждён - CP1251 дал бы только мусор
+        if encoding != 'utf-8':
+            raise
+        # Ошибка UTF-8 оказалась дальше начала файла - пробуем CP1251
+        text = data.decode('cp1251')
+    
+    # Приводим переносы строк к '\n', как при чтении в текстовом режиме
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
     
     # Проверяем, что файл не пустой
     if not text.strip():
         raise ValueError(f"Файл пустой: {file_path}")
     
+    _FILE_CACHE[cache_key] = text
     return text
 
 
+def _sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Перебирает границы предложений текста, не создавая подстрок.
+    
+    Предложения разделяются точкой, восклицательным или вопросительным знаком.
+    
+    Args:
+        text: Исходный текст
+        
+    Yields:
+        Кортежи (начало, конец) предложений
+    """
+    start = 0
+    for match in _SENT_RE.finditer(text):
+        yield start, match.start()
+        start = match.end()
+    yield start, len(text)
+
+
 def split_text(text: str, max_length: int = 5000) -> List[str]:
     """
     Разбивает текст на части (абзацы или предложения).
@@ -76,88 +195,426 @@ def split_text(text: str, max_length: int = 5000) -> List[str]:
         if len(part) <= max_length:
             final_parts.append(part)
         else:
-            # Разбиваем по предложениям (точка, восклицательный или вопросительный знак)
-            sentences = []
-            current_sentence = ""
+            # Объединяем предложения в части нужной длины, работая только с их границами
+            chunk_start = chunk_end = 0
+            for start, end in _sentence_spans(part):
+                # Предложение не помещается в текущую часть - начинаем новую
+                if chunk_end > chunk_start and end - chunk_start > max_length:
+                    final_parts.append(part[chunk_start:chunk_end])
+                    chunk_start = start
+                chunk_end = end
             
-            for char in part:
-                current_sentence += char
-                if char in '.!?':
-                    sentences.append(current_sentence.strip())
-                    current_sentence = ""
-            
-            # Добавляем остаток, если есть
-            if current_sentence.strip():
-                sentences.append(current_sentence.strip())
-            
-            # Объединяем предложения в части нужной длины
-            current_part = ""
-            for sentence in sentences:
-                if len(current_part) + len(sentence) + 1 <= max_length:
-                    if current_part:
-                        current_part += " " + sentence
-                    else:
-                        current_part = sentence
-                else:
-                    if current_part:
-                        final_parts.append(current_part)
-                    current_part = sentence
-            
-            if current_part:
-                final_parts.append(current_part)
+            final_parts.append(part[chunk_start:chunk_end])
     
     return final_parts if final_parts else [text]
 
 
-def find_answer(question: str, text_parts: List[str]) -> Tuple[str, int]:
+def build_index(parts_lower: List[str]) -> Tuple[Dict[str, int], array, array]:
     """
-    Находит ответ на вопрос, используя простой поиск по ключевым словам.
+    Строит инвертированный индекс по частям текста.
     
-    Ищет части текста, содержащие слова из вопроса, и возвращает наиболее релевантную.
+    Каждому слову присваивается номер в словаре vocab, а номера частей,
+    в которых встречается слово с номером t, хранятся подряд в массиве
+    indices[indptr[t]:indptr[t + 1]] (сжатый построчный формат, CSR).
+    Индекс строится один раз, после чего поиск не требует повторного
+    просмотра всего текста.
+    
+    Args:
+        parts_lower: Список частей текста в нижнем регистре
+        
+    Returns:
+        Кортеж (vocab, indptr, indices)
+    """
+    postings = {}
+    for part_id, part in enumerate(parts_lower):
+        # Каждое слово учитываем в части только один раз
+        for word in set(_WORD_RE.findall(part)) - _STOPWORDS:
+            postings.setdefault(word, []).append(part_id)
+    
+    # Укладываем списки частей в два плоских массива целых чисел
+    vocab = {}
+    indptr = array('i', [0])
+    indices = array('i')
+    for word_id, (word, part_ids) in enumerate(postings.items()):
+        # Интернированные ключи сравниваются со словами вопроса по ссылке
+        vocab[sys.intern(word)] = word_id
+        indices.extend(part_ids)
+        indptr.append(len(indices))
+    
+    return vocab, indptr, indices
+
+
+class Corpus(NamedTuple):
+    """
+    Текст, подготовленный для поиска ответов.
+    
+    Attributes:
+        corpus_id: Номер корпуса, по которому кэшируются результаты поиска
+        parts: Список частей текста
+        blob: Все части текста в нижнем регистре, соединённые через '\n'
+        offsets: Позиции начала каждой части в blob
+        vocab: Номера слов индекса
+        indptr: Границы списков частей для каждого слова в indices
+        indices: Номера частей, в которых встречаются слова
+    """
+    corpus_id: int
+    parts: List[str]
+    blob: str
+    offsets: array
+    vocab: Dict[str, int]
+    indptr: array
+    indices: array
+
+
+# Все построенные корпуса; corpus_id - позиция корпуса в этом списке
+_CORPORA: List[Corpus] = []
+
+
+def build_corpus(text_parts: List[str]) -> Corpus:
+    """
+    Строит индекс по частям текста и регистрирует корпус для поиска.
+    
+    Части приводятся к нижнему регистру один раз, при построении корпуса,
+    и хранятся одной строкой с позициями начала частей.
+    
+    Args:
+        text_parts: Список частей текста
+        
+    Returns:
+        Корпус, готовый для передачи в find_answer
+    """
+    parts_lower = [part.lower() for part in text_parts]
+    
+    # Позиция начала каждой части с учётом разделителя '\n' после предыдущих частей
+    offsets = array('q')
+    position = 0
+    for part in parts_lower:
+        offsets.append(position)
+        position += len(part) + 1
+    
+    return _register_corpus(text_parts, "\n".join(parts_lower), offsets,
+                            *build_index(parts_lower))
+
+
+def _register_corpus(*fields) -> Corpus:
+    """
+    Присваивает корпусу номер и добавляет его в _CORPORA.
+    
+    Args:
+        fields: Поля Corpus, кроме corpus_id, в порядке объявления
+        
+    Returns:
+        Зарегистрированный корпус
+    """
+    corpus = Corpus(len(_CORPORA), *fields)
+    _CORPORA.append(corpus)
+    return corpus
+
+
+def save_corpus(file_path: str, corpus: Corpus, source_stat: os.stat_result) -> bool:
+    """
+    Сохраняет корпус рядом с исходным файлом, чтобы не строить его при следующем запуске.
+    
+    Сохранённый корпус привязан к времени изменения и размеру исходного файла.
+    Первая строка файла - JSON с частями текста и словарём, за ней идут байты
+    массивов offsets, indptr и indices.
+    
+    Args:
+        file_path: Путь к исходному текстовому файлу
+        corpus: Корпус, построенный по этому файлу
+        source_stat: Результат os.stat исходного файла, полученный до его чтения
+        
+    Returns:
+        True, если корпус сохранён; False, если записать файл не удалось
+    """
+    index_path = file_path + INDEX_SUFFIX
+    tmp_path = index_path + ".tmp"
+    arrays = (corpus.offsets, corpus.indptr, corpus.indices)
+    try:
+        header = {
+            "version": _INDEX_VERSION,
+            "key": [source_stat.st_mtime_ns, source_stat.st_size],
+            "byteorder": sys.byteorder,
+            "parts": corpus.parts,
+            "blob": corpus.blob,
+            "vocab": corpus.vocab,
+            "lengths": [len(values) for values in arrays],
+        }
+        # Пишем во временный файл и заменяем, чтобы не оставить наполовину записанный индекс
+        with open(tmp_path, 'wb') as file:
+            file.write(json.dumps(header, ensure_ascii=False).encode('utf-8'))
+            file.write(b"\n")
+            for values in arrays:
+                file.write(values.tobytes())
+        os.replace(tmp_path, index_path)
+    except OSError:
+        # Например, папка только для чтения - просто работаем без сохранённого индекса
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _check_corpus_fields(parts, blob, offsets, vocab, indptr, indices) -> None:
+    """
+    Проверяет, что поля загруженного корпуса согласованы и поиск по ним не упадёт.
+    
+    Args:
+        parts, blob, offsets, vocab, indptr, indices: Поля Corpus, кроме corpus_id
+        
+    Raises:
+        ValueError: Если поля не соответствуют тому, что строит build_corpus
+    """
+    if not (isinstance(parts, list) and parts
+            and all(isinstance(part, str) for part in parts)):
+        raise ValueError("Неверный список частей в индексе")
+    if not isinstance(blob, str) or not isinstance(vocab, dict):
+        raise ValueError("Неверный формат индекса")
+    
+    # Позиции частей должны начинаться с нуля, не убывать и не выходить за blob
+    if (len(offsets) != len(parts) or offsets[0] != 0 or offsets[-1] > len(blob)
+            or any(a > b for a, b in zip(offsets, offsets[1:]))):
+        raise ValueError("Неверные позиции частей в индексе")
+    
+    # Номера слов - различные целые числа от 0 до len(vocab) - 1
+    if (any(type(word_id) is not int or not 0 <= word_id < len(vocab)
+            for word_id in vocab.values())
+            or len(set(vocab.values())) != len(vocab)):
+        raise ValueError("Неверный словарь индекса")
+    
+    # Границы списков частей не убывают и покрывают весь массив indices
+    if (len(indptr) != len(vocab) + 1 or indptr[0] != 0 or indptr[-1] != len(indices)
+            or any(a > b for a, b in zip(indptr, indptr[1:]))):
+        raise ValueError("Неверные границы списков частей в индексе")
+    if indices and not (min(indices) >= 0 and max(indices) < len(parts)):
+        raise ValueError("Неверные номера частей в индексе")
+
+
+def load_corpus(file_path: str) -> Optional[Corpus]:
+    """
+    Загружает корпус, сохранённый save_corpus, если исходный файл с тех пор не менялся.
+    
+    Args:
+        file_path: Путь к исходному текстовому файлу
+        
+    Returns:
+        Корпус или None, если сохранённого корпуса нет, он устарел или повреждён
+    """
+    try:
+        st = os.stat(file_path)
+        with open(file_path + INDEX_SUFFIX, 'rb') as file:
+            header = json.loads(file.readline().decode('utf-8'))
+            if not isinstance(header, dict):
+                raise ValueError("Неверный формат индекса")
+            if (header["version"] != _INDEX_VERSION
+                    or header["key"] != [st.st_mtime_ns, st.st_size]
+                    or header["byteorder"] != sys.byteorder):
+                return None
+            
+            # Массивы читаем в тех же типах, в которых их строят build_corpus и build_index
+            lengths = header["lengths"]
+            if not (isinstance(lengths, list) and len(lengths) == len(_INDEX_TYPECODES)
+                    and all(type(length) is int and length >= 0 for length in lengths)):
+                raise ValueError("Неверные длины массивов в индексе")
+            arrays = []
+            for typecode, length in zip(_INDEX_TYPECODES, lengths):
+                values = array(typecode)
+                data = file.read(values.itemsize * length)
+                if len(data) != values.itemsize * length:
+                    raise EOFError("Индекс обрезан")
+                values.frombytes(data)
+                arrays.append(values)
+        
+        offsets, indptr, indices = arrays
+        parts, blob, vocab = header["parts"], header["blob"], header["vocab"]
+        _check_corpus_fields(parts, blob, offsets, vocab, indptr, indices)
+        # Интернируем ключи словаря, как build_index, чтобы слова вопроса сравнивались по ссылке
+        vocab = {sys.intern(word): word_id for word, word_id in vocab.items()}
+        return _register_corpus(parts, blob, offsets, vocab, indptr, indices)
+    except (OSError, ValueError, KeyError, TypeError, EOFError):
+        # Отсутствующий или повреждённый индекс просто строится заново
+        return None
+
+
+def score_all(word_ids: List[int], indptr: array, indices: array, n_parts: int) -> List[int]:
+    """
+    Подсчитывает для каждой части текста количество найденных в ней слов.
+    
+    Работает только с номерами слов и частей, без строк.
+    
+    Args:
+        word_ids: Номера слов вопроса в словаре индекса
+        indptr: Границы списков частей для каждого слова в indices
+        indices: Номера частей, в которых встречаются слова
+        n_parts: Количество частей текста
+        
+    Returns:
+        Список количества совпадений для каждой части
+    """
+    scores = [0] * n_parts
+    for word_id in word_ids:
+        # Обходим только части, в которых встречается слово
+        for part_id in indices[indptr[word_id]:indptr[word_id + 1]]:
+            scores[part_id] += 1
+    return scores
+
+
+def scan_parts(words: List[str], blob: str, offsets: array) -> List[int]:
+    """
+    Подсчитывает для каждой части количество слов, входящих в неё как подстрока.
+    
+    Части, где есть хотя бы одно слово, находятся одним регулярным выражением
+    за один проход по всему тексту; затем в каждой такой части проверяется
+    каждое слово. Так находятся и другие формы слова (например, «шкаф» в «шкафу»).
+    
+    Args:
+        words: Ключевые слова вопроса
+        blob: Все части текста в нижнем регистре, соединённые через '\n'
+        offsets: Позиции начала каждой части в blob
+        
+    Returns:
+        Список количества найденных слов для каждой части
+    """
+    # Одним проходом находим части, где встречается хотя бы одно из слов
+    pattern = re.compile("|".join(map(re.escape, words)))
+    candidates = {bisect.bisect_right(offsets, match.start()) - 1
+                  for match in pattern.finditer(blob)}
+    
+    # В найденных частях проверяем каждое слово отдельно, так как совпадения
+    # регулярного выражения не пересекаются («шкаф» внутри «шкафу»)
+    scores = [0] * len(offsets)
+    for part_id in candidates:
+        end = offsets[part_id + 1] - 1 if part_id + 1 < len(offsets) else len(blob)
+        part = blob[offsets[part_id]:end]
+        scores[part_id] = sum(1 for word in words if word in part)
+    return scores
+
+
+@functools.lru_cache(maxsize=512)
+def _find_answer_impl(normalized_question: str, corpus_id: int) -> Tuple[int, int]:
+    """
+    Находит наиболее релевантную часть корпуса для нормализованного вопроса.
+    
+    Результат кэшируется, поэтому повторные вопросы не пересчитываются.
+    
+    Args:
+        normalized_question: Уникальные ключевые слова вопроса через пробел
+        corpus_id: Номер корпуса в _CORPORA
+        
+    Returns:
+        Кортеж (номер лучшей части, количество совпадений)
+    """
+    corpus = _CORPORA[corpus_id]
+    
+    # Переводим слова в номера; слова, которых нет в индексе, откладываем
+    words = [sys.intern(word) for word in normalized_question.split()]
+    word_ids = [corpus.vocab[word] for word in words if word in corpus.vocab]
+    missed_words = [word for word in words if word not in corpus.vocab]
+    scores = score_all(word_ids, corpus.indptr, corpus.indices, len(corpus.parts))
+    
+    # Слова, не найденные целиком, ищем как подстроки, чтобы учесть другие формы слова
+    if missed_words:
+        substring_scores = scan_parts(missed_words, corpus.blob, corpus.offsets)
+        scores = [a + b for a, b in zip(scores, substring_scores)]
+    
+    # Первая часть с наибольшим количеством совпадений: max и index
+    # проходят по списку без вызова функции Python для каждой части
+    best_score = max(scores)
+    return scores.index(best_score), best_score
+
+
+def _normalize_question(question: str) -> str:
+    """
+    Выделяет ключевые слова вопроса и приводит их к виду ключа кэша.
     
     Args:
         question: Вопрос пользователя
-        text_parts: Список частей текста для поиска
+        
+    Returns:
+        Уникальные ключевые слова через пробел (пустая строка, если слов нет)
+    """
+    # Разбиваем вопрос на слова так же, как при построении индекса
+    question_words = {word for word in _WORD_RE.findall(question.lower())
+                      if word not in _STOPWORDS}
+    
+    # Порядок и повторы слов не влияют на ответ, поэтому ключ кэша - отсортированный набор слов
+    return " ".join(sorted(question_words))
+
+
+def _make_answer(corpus: Corpus, normalized_question: str,
+                 best_id: int, best_score: int) -> Tuple[str, int]:
+    """
+    Формирует ответ по номеру лучшей части корпуса.
+    
+    Args:
+        corpus: Корпус, в котором выполнялся поиск
+        normalized_question: Результат _normalize_question для вопроса
+        best_id: Номер лучшей части
+        best_score: Количество совпадений в лучшей части
         
     Returns:
         Кортеж (найденный текст, количество совпадений)
     """
-    # Приводим вопрос к нижнему регистру и разбиваем на слова
-    question_lower = question.lower()
-    # Убираем знаки препинания и разбиваем на слова
-    question_words = [word.strip('.,!?;:()[]{}"\'') 
-                     for word in question_lower.split() 
-                     if len(word.strip('.,!?;:()[]{}"\'')) > 2]  # Игнорируем короткие слова
+    # Ключевых слов нет - ответа нет
+    if not normalized_question:
+        return "", 0
     
-    if not question_words:
-        return "Не удалось определить ключевые слова в вопросе.", 0
+    # Если не нашли совпадений, возвращаем начало первой части текста
+    if best_score == 0:
+        return corpus.parts[0][:500], 0
     
-    best_match = ""
-    best_score = 0
+    return corpus.parts[best_id], best_score
+
+
+def find_answer(question: str, corpus: Corpus) -> Tuple[str, int]:
+    """
+    Находит ответ на вопрос, используя простой поиск по ключевым словам.
+    
+    Ищет части текста, содержащие слова из вопроса, и возвращает наиболее релевантную.
     
-    # Ищем в каждой части текста
-    for part in text_parts:
-        part_lower = part.lower()
-        score = 0
+    Args:
+        question: Вопрос пользователя
+        corpus: Корпус, построенный build_corpus
         
-        # Подсчитываем количество совпадений ключевых слов
-        for word in question_words:
-            if word in part_lower:
-                score += 1
+    Returns:
+        Кортеж (найденный текст, количество совпадений). Если совпадений нет,
+        возвращается начало текста и 0; если в вопросе нет ключевых слов -
+        пустая строка и 0.
+    """
+    normalized_question = _normalize_question(question)
+    if not normalized_question:
+        return _make_answer(corpus, normalized_question, 0, 0)
+    
+    best_id, best_score = _find_answer_impl(normalized_question, corpus.corpus_id)
+    return _make_answer(corpus, normalized_question, best_id, best_score)
+
+
+def find_answers(questions: List[str], corpus: Corpus) -> List[Tuple[str, int]]:
+    """
+    Находит ответы сразу на несколько вопросов.
+    
+    Одинаковые вопросы обрабатываются один раз; результаты попадают в тот же
+    кэш, что и у find_answer.
+    
+    Args:
+        questions: Список вопросов
+        corpus: Корпус, построенный build_corpus
         
-        # Если нашли больше совпадений, обновляем лучший результат
-        if score > best_score:
-            best_score = score
-            best_match = part
+    Returns:
+        Список кортежей (найденный текст, количество совпадений) в порядке вопросов
+    """
+    normalized_questions = [_normalize_question(question) for question in questions]
     
-    # Если не нашли совпадений, возвращаем первую часть текста
-    if best_score == 0:
-        return "Не найдено точного совпадения. Вот начало текста:\n" + text_parts[0][:500], 0
+    # Считаем каждый уникальный вопрос отдельно, чтобы в памяти была одна строка оценок
+    best = {q: _find_answer_impl(q, corpus.corpus_id)
+            for q in dict.fromkeys(normalized_questions) if q}
     
-    return best_match, best_score
+    return [_make_answer(corpus, q, *best.get(q, (0, 0))) for q in normalized_questions]
 
 
-def format_answer(answer_text: str, max_display_length: int = 1000) -> str:
+def format_answer(answer_text: str, max_display_length: int = 1000) -> Tuple[str, bool]:
     """
     Форматирует ответ для вывода, ограничивая длину при необходимости.
     
@@ -166,13 +623,40 @@ def format_answer(answer_text: str, max_display_length: int = 1000) -> str:
         max_display_length: Максимальная длина для отображения
         
     Returns:
-        Отформатированный текст ответа
+        Кортеж (текст для вывода, был ли текст обрезан)
     """
     if len(answer_text) <= max_display_length:
-        return answer_text
+        return answer_text, False
     
-    # Обрезаем текст и добавляем указание на продолжение
-    return answer_text[:max_display_length] + "\n\n[... текст обрезан ...]"
+    # Обрезаем текст; указание на продолжение выводит print_answer
+    return answer_text[:max_display_length], True
+
+
+def print_answer(answer: str, score: int) -> None:
+    """
+    Выводит ответ и количество совпадений в консоль.
+    
+    Args:
+        answer: Текст ответа
+        score: Количество совпадений
+    """
+    print("\n" + "-" * 60)
+    print("Ответ:")
+    print("-" * 60)
+    if not answer:
+        print("Не удалось определить ключевые слова в вопросе.")
+    else:
+        if score == 0:
+            # Совпадений нет - find_answer вернул начало текста
+            print("Не найдено точного совпадения. Вот начало текста:")
+        formatted_answer, truncated = format_answer(answer)
+        print(formatted_answer)
+        if truncated:
+            print("\n[... текст обрезан ...]")
+    if score > 0:
+        print(f"\n(Найдено совпадений: {score})")
+    print("-" * 60)
+    print()
 
 
 def main():
@@ -194,26 +678,60 @@ def main():
     if not file_path:
         file_path = default_file
     
-    # Читаем файл
-    try:
-        print(f"\nЧтение файла: {file_path}")
-        text = read_text_file(file_path)
-        print(f"✓ Файл успешно прочитан. Размер: {len(text)} символов")
-    except FileNotFoundError as e:
-        print(f"❌ Ошибка: {e}")
-        print("\nУбедитесь, что файл существует в указанном пути.")
-        return
-    except ValueError as e:
-        print(f"❌ Ошибка: {e}")
-        return
-    except Exception as e:
-        print(f"❌ Неожиданная ошибка при чтении файла: {e}")
-        return
+    # Если файл не менялся с прошлого запуска, берём сохранённый корпус
+    corpus = load_corpus(file_path)
+    if corpus is not None:
+        print(f"\n✓ Загружен сохранённый индекс: {file_path}{INDEX_SUFFIX}")
+        print(f"✓ Текст разбит на {len(corpus.parts)} частей")
+    else:
+        # Ключ для сохранённого индекса берём до чтения: если файл изменится
+        # во время разбора, следующий запуск просто построит индекс заново
+        try:
+            source_stat = os.stat(file_path)
+        except OSError:
+            source_stat = None  # Ошибку сообщит read_text_file
+        
+        # Читаем файл
+        try:
+            print(f"\nЧтение файла: {file_path}")
+            text = read_text_file(file_path)
+            print(f"✓ Файл успешно прочитан. Размер: {len(text)} символов")
+        except FileNotFoundError as e:
+            print(f"❌ Ошибка: {e}")
+            print("\nУбедитесь, что файл существует в указанном пути.")
+            return
+        except ValueError as e:
+            print(f"❌ Ошибка: {e}")
+            return
+        except Exception as e:
+            print(f"❌ Неожиданная ошибка при чтении файла: {e}")
+            return
+        
+        # Разбиваем текст на части
+        print("\nРазбиение текста на части...")
+        text_parts = split_text(text)
+        corpus = build_corpus(text_parts)
+        print(f"✓ Текст разбит на {len(text_parts)} частей")
+        
+        # Сохраняем корпус, чтобы следующий запуск не строил его заново
+        if source_stat is not None:
+            save_corpus(file_path, corpus, source_stat)
     
-    # Разбиваем текст на части
-    print("\nРазбиение текста на части...")
-    text_parts = split_text(text)
-    print(f"✓ Текст разбит на {len(text_parts)} частей")
+    # Если вопросы переданы через канал или файл, отвечаем на все сразу
+    if not sys.stdin.isatty():
+        questions = []
+        for line in sys.stdin:
+            question = line.strip()
+            if not question:
+                continue
+            if question.casefold() in _EXIT_CMDS:
+                break
+            questions.append(question)
+        
+        for question, (answer, score) in zip(questions, find_answers(questions, corpus)):
+            print(f"\nВопрос: {question}")
+            print_answer(answer, score)
+        return
     
     # Основной цикл вопросов
     print("\n" + "=" * 60)
@@ -224,28 +742,19 @@ def main():
     while True:
         question = input("Ваш вопрос: ").strip()
         
-        # Проверяем команды выхода
-        if question.lower() in ['выход', 'exit', 'quit', 'q']:
-            print("\nДо свидания!")
-            break
-        
         if not question:
             print("Пожалуйста, введите вопрос.")
             continue
         
+        # Проверяем команды выхода
+        if question.casefold() in _EXIT_CMDS:
+            print("\nДо свидания!")
+            break
+        
         # Ищем ответ
         try:
-            answer, score = find_answer(question, text_parts)
-            formatted_answer = format_answer(answer)
-            
-            print("\n" + "-" * 60)
-            print("Ответ:")
-            print("-" * 60)
-            print(formatted_answer)
-            if score > 0:
-                print(f"\n(Найдено совпадений: {score})")
-            print("-" * 60)
-            print()
+            answer, score = find_answer(question, corpus)
+            print_answer(answer, score)
         except Exception as e:
             print(f"❌ Ошибка при поиске ответа: {e}")
             print()